@@ -5,15 +5,6 @@ import asyncio
 import argparse
 import contextlib
 
-
-from .server import AdbServer
-from .server.routing import App
-from .services.host import HostService
-from .services import LocalShellService
-from .transport.device_manager import SingleDeviceService
-from .transport.device import Device
-from .services import SyncV1Service, ForwardService, MemoryFileSystem
-
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +21,15 @@ def parse_args() -> argparse.Namespace:
 
 
 async def _run_server(host: str, port: int) -> None:
+    # Imported here so that `--help` and argument errors do not load the services
+    from .server import AdbServer
+    from .server.routing import App
+    from .services.host import HostService
+    from .services import LocalShellService
+    from .transport.device_manager import SingleDeviceService
+    from .transport.device import Device
+    from .services import SyncV1Service, ForwardService, MemoryFileSystem
+
     device_manager = SingleDeviceService(device=Device(
         id="device-1",
         serial="fake-5554",
@@ -72,9 +72,20 @@ async def _run_server(host: str, port: int) -> None:
         await server.stop()
 
 
+def _install_event_loop_policy() -> None:
+    # uvloop is optional, fall back to the default asyncio loop if it is not installed
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.debug("Using uvloop event loop")
+
+
 def main() -> None:
     logging.basicConfig(level=logging.DEBUG, format='[%(asctime)s][%(levelname)s] %(message)s')
     args = parse_args()
+    _install_event_loop_policy()
     asyncio.run(_run_server(args.host, args.port))
 
 
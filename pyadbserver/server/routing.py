@@ -3,10 +3,11 @@ from __future__ import annotations
 import re
 import logging
 import inspect
+import functools
 import contextvars
+from types import CoroutineType as _CoroutineType, MappingProxyType
 from enum import Enum, auto
-from dataclasses import dataclass, field
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union, TYPE_CHECKING
 import warnings
 
 if TYPE_CHECKING:
@@ -20,8 +21,15 @@ class ResponseAction(Enum):
     KEEP_ALIVE = auto()
 
 
-@dataclass
-class Response:
+# Enum member lookups go through the metaclass, plain globals are much cheaper on hot paths
+_CLOSE = ResponseAction.CLOSE
+_KEEP_ALIVE = ResponseAction.KEEP_ALIVE
+
+
+class Response(NamedTuple):
+    """
+    Immutable handler result, so the same instance can be returned for every request.
+    """
     kind: str
     data: Optional[bytes] = None
     action: ResponseAction = ResponseAction.CLOSE
@@ -31,19 +39,50 @@ logger = logging.getLogger(__name__)
 g_session: contextvars.ContextVar["SmartSocketSession"] = contextvars.ContextVar("current_session")
 Handler = Callable[..., Union[Awaitable[Response], Response, None]]
 
+MATCH_CACHE_SIZE = 1024
+"""Maximum number of payloads whose placeholder route match is memoized."""
+
+MATCH_CACHE_MAX_PAYLOAD = 256
+"""Longer payloads are matched every time instead of being memoized."""
+
+_EMPTY_PARAMS: Mapping[str, str] = MappingProxyType({})
+
+_ERR_UNSUPPORTED = b"unsupported operation for payload: "
+_ERR_NO_DEVICE_SPECIFIED = b"no device specified for device-only command"
+_ERR_NO_DEVICE_AVAILABLE = b"no device available"
+_ERR_INTERNAL = b"internal error"
+_ERR_UNKNOWN = b"unknown error"
 
-@dataclass
-class Route:
+class Route(NamedTuple):
+    """
+    Registered route. Immutable, like Response, and stored without a per-instance __dict__.
+    """
     pattern: str
     handler: Callable[..., Awaitable[Optional[Response]]]
     is_device_route: bool = False
     prefix_only: bool = False
+    literal_prefix: str = ""
+    """Text before the first placeholder, every matching payload starts with it."""
+    regex: Optional["re.Pattern[str]"] = None
+    """Compiled pattern, only set for patterns with placeholders."""
+
+
+_MatchEntry = Tuple[str, Callable[[str], Optional["re.Match[str]"]], Route]
+
+
+_OK_EMPTY = Response("OK")
+_OK_EMPTY_KEEP_ALIVE = Response("OK", None, _KEEP_ALIVE)
 
 
 def OK(data: Optional[bytes] = None, raw: bool = False, action: ResponseAction = ResponseAction.CLOSE) -> Response:
     """
     Sends an OK response with optional data.
     """
+    if data is None and not raw:
+        if action is _CLOSE:
+            return _OK_EMPTY
+        if action is _KEEP_ALIVE:
+            return _OK_EMPTY_KEEP_ALIVE
     return Response("OK", data, action, raw)
 
 
@@ -62,102 +101,206 @@ def NOOP(action: ResponseAction = ResponseAction.CLOSE, raw: bool = False) -> Re
     """
     return Response("NOOP", None, action, raw)
 
-def _ensure_awaitable(result: Union[Response, None, Awaitable[Response]]) -> Awaitable[Optional[Response]]:
-    if inspect.isawaitable(result):
+def _as_async_handler(handler: Handler) -> Callable[..., Awaitable[Optional[Response]]]:
+    """
+    Return `handler` itself if it is a coroutine function, otherwise wrap it
+    in one. Sync handlers may still return an awaitable, which is awaited.
+    """
+    if inspect.iscoroutinefunction(handler):
+        return handler  # type: ignore[return-value]
+    async def _handler(*args: Any, **kwargs: Any) -> Optional[Response]:
+        result = handler(*args, **kwargs)
+        # Plain results and coroutines are recognized by an exact type check,
+        # only other objects pay for the generic awaitable check.
+        cls = result.__class__
+        if cls is _CoroutineType or (cls is not Response and result is not None and inspect.isawaitable(result)):
+            result = await result
         return result  # type: ignore[return-value]
-    async def _wrapped() -> Optional[Response]:
-        return result  # type: ignore[misc]
-    return _wrapped()
+    return _handler
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> "re.Pattern[str]":
+    """
+    Convert a route pattern to a regex: <name> becomes (?P<name>...) and literal characters are escaped.
+    Results are cached, so routers registering the same pattern share one compiled regex.
+
+    A placeholder captures up to the first character of the literal following it,
+    or everything remaining if it is the last part of the pattern.
+    """
+    regex_parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == '<':
+            # Find the closing >
+            close_idx = pattern.find('>', i)
+            if close_idx == -1:
+                raise ValueError(f"malformed route pattern: {pattern!r}")
+            param_name = pattern[i+1:close_idx]
+
+            # Determine what comes after this placeholder to decide the capture pattern
+            next_literal = ''
+            if close_idx + 1 < len(pattern):
+                # Find the next placeholder or end of string
+                next_open = pattern.find('<', close_idx + 1)
+                if next_open == -1:
+                    # No more placeholders, use the rest as literal
+                    next_literal = pattern[close_idx + 1:]
+                else:
+                    # Use characters between this > and next < as literal
+                    next_literal = pattern[close_idx + 1:next_open]
+
+            if next_literal:
+                # Capture until the next literal character
+                regex_parts.append(f"(?P<{param_name}>[^{re.escape(next_literal[0])}]+)")
+            else:
+                # Last parameter, capture everything remaining
+                regex_parts.append(f"(?P<{param_name}>.+)")
+
+            i = close_idx + 1
+        else:
+            # Find the next placeholder or end of string
+            next_open = pattern.find('<', i)
+            if next_open == -1:
+                # No more placeholders, rest is literal
+                regex_parts.append(re.escape(pattern[i:]))
+                i = len(pattern)
+            else:
+                # Literal characters before next placeholder
+                regex_parts.append(re.escape(pattern[i:next_open]))
+                i = next_open
+
+    return re.compile('^' + ''.join(regex_parts) + '$')
 
 
 class Router:
     def __init__(self) -> None:
-        self._routes: List[Route] = []
+        # Patterns without placeholders are matched by a single dict lookup,
+        # only the remaining ones go through pattern matching.
+        self._static: Dict[str, Route] = {}
+        self._dynamic: List[Route] = []
+        # First ':'-separated segment of the payload -> placeholder routes that can match it.
+        # Only the first segment is indexed: placeholder values may contain ':' themselves.
+        # Entries are flat (literal_prefix, regex.match, route) tuples so the scan
+        # in match() unpacks them instead of doing attribute lookups.
+        self._dynamic_by_head: Dict[str, List[_MatchEntry]] = {}
+        # Placeholder routes whose first segment is not a literal, tried for any payload
+        self._dynamic_headless: List[_MatchEntry] = []
+        # payload -> (route, params) of previous placeholder matches, evicted FIFO
+        self._match_cache: Dict[str, Tuple[Route, Mapping[str, str]]] = {}
 
     def add_route(self, pattern: str, handler: Handler, is_device_route: bool = False, prefix_only: bool = False) -> None:
-        async def _handler(*args: Any, **kwargs: Any) -> Optional[Response]:
-            return await _ensure_awaitable(handler(*args, **kwargs))
-        self._routes.append(Route(pattern, _handler, is_device_route, prefix_only))
-
-    def match(self, payload: str) -> Tuple[Optional[Route], Dict[str, str]]:
-        # Sort routes by pattern length (descending) to match more specific patterns first
-        sorted_routes = sorted(self._routes, key=lambda r: len(r.pattern), reverse=True)
-        for route in sorted_routes:
-            ok, params = self._match_pattern(route.pattern, payload)
-            if ok:
-                return route, params
-        return None, {}
+        regex = _compile_pattern(pattern) if "<" in pattern else None
+        route = Route(pattern, _as_async_handler(handler), is_device_route, prefix_only, pattern.partition("<")[0], regex)
+        if regex is not None:
+            self._dynamic.append(route)
+            # Longer patterns are more specific and are tried first. The sort is stable,
+            # so patterns of equal length keep their registration order.
+            self._dynamic.sort(key=lambda r: len(r.pattern), reverse=True)
+            self._index_dynamic()
+        else:
+            # First registration wins, same as the ordered scan did
+            self._static.setdefault(pattern, route)
+        self._match_cache.clear()
 
     @staticmethod
-    def _match_pattern(pattern: str, payload: str) -> Tuple[bool, Dict[str, str]]:
-        # Advanced pattern matching with support for <name> placeholders and literal characters
-        # Convert pattern to regex: <name> becomes (?P<name>...) and escape literal chars
-        regex_parts = []
-        params_order = []
-        i = 0
-        while i < len(pattern):
-            if pattern[i] == '<':
-                # Find the closing >
-                close_idx = pattern.find('>', i)
-                if close_idx == -1:
-                    # Malformed pattern
-                    return False, {}
-                param_name = pattern[i+1:close_idx]
-                params_order.append(param_name)
-                
-                # Determine what comes after this placeholder to decide the capture pattern
-                next_literal = ''
-                if close_idx + 1 < len(pattern):
-                    # Find the next placeholder or end of string
-                    next_open = pattern.find('<', close_idx + 1)
-                    if next_open == -1:
-                        # No more placeholders, use the rest as literal
-                        next_literal = pattern[close_idx + 1:]
-                    else:
-                        # Use characters between this > and next < as literal
-                        next_literal = pattern[close_idx + 1:next_open]
-                
-                if next_literal:
-                    # Capture until the next literal character(s)
-                    # Escape the literal for use in regex
-                    escaped_literal = re.escape(next_literal)
-                    regex_parts.append(f"(?P<{param_name}>[^{re.escape(next_literal[0])}]+)")
-                else:
-                    # Last parameter, capture everything remaining
-                    regex_parts.append(f"(?P<{param_name}>.+)")
-                
-                i = close_idx + 1
-            else:
-                # Find the next placeholder or end of string
-                next_open = pattern.find('<', i)
-                if next_open == -1:
-                    # No more placeholders, rest is literal
-                    literal = pattern[i:]
-                    regex_parts.append(re.escape(literal))
-                    i = len(pattern)
-                else:
-                    # Literal characters before next placeholder
-                    literal = pattern[i:next_open]
-                    regex_parts.append(re.escape(literal))
-                    i = next_open
-        
-        # Construct the full regex
-        regex_pattern = '^' + ''.join(regex_parts) + '$'
-        
-        # Try to match
-        match = re.match(regex_pattern, payload)
-        if not match:
-            return False, {}
-        
-        # Extract parameters
-        params = match.groupdict()
-        return True, params
+    def _head(route: Route) -> Optional[str]:
+        head, sep, _ = route.literal_prefix.partition(":")
+        return head if sep else None
+
+    def _index_dynamic(self) -> None:
+        # Buckets keep the order of self._dynamic, including the headless routes
+        entries = [(self._head(r), (r.literal_prefix, r.regex.match, r)) for r in self._dynamic]  # type: ignore[union-attr]
+        self._dynamic_headless = [e for h, e in entries if h is None]
+        heads = {h for h, _ in entries} - {None}
+        self._dynamic_by_head = {
+            head: [e for h, e in entries if h in (head, None)]
+            for head in heads
+        }
+
+    def match(self, payload: str) -> Tuple[Optional[Route], Mapping[str, str]]:
+        route = self._static.get(payload)
+        if route is not None:
+            return route, _EMPTY_PARAMS
+        cached = self._match_cache.get(payload)
+        if cached is not None:
+            return cached
+        candidates = self._dynamic_by_head.get(payload.partition(":")[0], self._dynamic_headless)
+        for literal_prefix, regex_match, route in candidates:
+            if not payload.startswith(literal_prefix):
+                continue
+            match = regex_match(payload)
+            if match is not None:
+                # Read-only, so callers cannot change the params of a cached match
+                params = MappingProxyType(match.groupdict())
+                # Routes ending in a placeholder (e.g. shell:<cmd>) take arbitrary payloads
+                # that rarely repeat, memoizing them would only fill the cache
+                if len(payload) <= MATCH_CACHE_MAX_PAYLOAD and not route.pattern.endswith(">"):
+                    if len(self._match_cache) >= MATCH_CACHE_SIZE:
+                        self._match_cache.pop(next(iter(self._match_cache)))
+                    self._match_cache[payload] = (route, params)
+                return route, params
+        return None, _EMPTY_PARAMS
+
+
+def _route_methods(obj: Any) -> List[Tuple[str, str, bool, bool]]:
+    """
+    Return `(name, pattern, is_device_route, prefix_only)` for every route attribute of `obj`.
+
+    Finds the same attributes as dir() and getattr() would: for a class those of
+    its MRO, otherwise the object's own attributes (e.g. a module's functions)
+    followed by those of its class.
+    """
+    # Walk the namespace dicts instead of resolving every attribute with getattr()
+    if isinstance(obj, type):
+        classes = obj.__mro__
+        namespaces = []
+    else:
+        classes = type(obj).__mro__
+        own = getattr(obj, "__dict__", None)
+        namespaces = [own] if own is not None else []
+    namespaces.extend(vars(klass) for klass in classes if klass is not object)
+
+    methods: List[Tuple[str, str, bool, bool]] = []
+    seen = set()
+    for namespace in namespaces:
+        for name, attr in namespace.items():
+            # Earlier namespaces shadow later ones, like attribute lookup does
+            if name in seen:
+                continue
+            seen.add(name)
+
+            # The decorators store their markers in the function's own __dict__
+            attrs = getattr(getattr(attr, "__func__", attr), "__dict__", None)
+            if not attrs:
+                continue
+            pattern = attrs.get("__route_pattern__")
+            if pattern is None:
+                continue
+            is_device_route = attrs.get("__is_device_route__", False)
+            prefix_only = attrs.get("__prefix_only__", False)
+            methods.append((name, pattern, is_device_route, prefix_only))
+
+    return methods
 
 
 class App:
     def __init__(self, *, device_manager: "DeviceService") -> None:
         self._router = Router()
         self._device_manager = device_manager
+        # Bound once, dispatch calls these for every device request
+        self._get_device = device_manager.get_device
+        self._get_selected = device_manager.get_selected
+        self._first_device: Callable[[], Optional["Device"]] = getattr(
+            device_manager, "first_device", self._first_listed_device
+        )
+        # Whether the 'host:' fallback in dispatch has already been reported
+        self._host_fallback_warned = False
+
+    def _first_listed_device(self) -> Optional["Device"]:
+        # Fallback for device services without first_device()
+        devices = self._device_manager.list_devices()
+        return devices[0] if devices else None
 
     # decorator sugar
     def route(self, pattern: str) -> Callable[[Handler], Handler]:
@@ -191,19 +334,8 @@ class App:
 
         :param obj: The object to register the methods for.
         """
-        for name in dir(obj):
-            fn = getattr(obj, name)
-
-            attr_source = fn
-            if hasattr(attr_source, "__func__"):
-                attr_source = attr_source.__func__
-
-            pattern = getattr(attr_source, "__route_pattern__", None)
-            is_device_route = getattr(attr_source, "__is_device_route__", False)
-            prefix_only = getattr(attr_source, "__prefix_only__", False)
-
-            if pattern is not None:
-                self._router.add_route(pattern, fn, is_device_route=is_device_route, prefix_only=prefix_only)
+        for name, pattern, is_device_route, prefix_only in _route_methods(obj):
+            self._router.add_route(pattern, getattr(obj, name), is_device_route=is_device_route, prefix_only=prefix_only)
 
     async def dispatch(self, payload: str, session: 'SmartSocketSession') -> ResponseAction:
         """
@@ -216,78 +348,85 @@ class App:
         device: Optional["Device"] = None
         
         # host-serial:<serial>:<request>
-        match = re.match(r"host-serial:([^:]+):(.+)", payload)
-        if match:
-            serial, payload = match.groups()
-            device = self._device_manager.get_device(serial)
-            if device is None:
-                await session.send_fail(f"device '{serial}' not found".encode("utf-8"))
-                return ResponseAction.CLOSE
+        if payload.startswith("host-serial:"):
+            serial, _, request = payload[12:].partition(":")
+            if serial and request:
+                payload = request
+                device = self._get_device(serial)
+                if device is None:
+                    await session.send_fail(b"device '%b' not found" % serial.encode("utf-8"))
+                    return _CLOSE
         
         route, params = self._router.match(payload)
         if route is None and payload.startswith("host:"):
             # Fallback: allow routes defined without the 'host:' prefix to match
-            warnings.warn(
-                "Some route does not start with 'host:', falling back to match without 'host:' prefix. "
-                "This will only show once. "
-                "Enable logging to see more details."
-            )
-            logger.warning(f"Route '{payload}' does not start with 'host:', falling back to match without 'host:' prefix")
-            route, params = self._router.match(payload[len("host:"):])
+            if not self._host_fallback_warned:
+                self._host_fallback_warned = True
+                warnings.warn(
+                    "Some route does not start with 'host:', falling back to match without 'host:' prefix. "
+                    "This will only show once. "
+                    "Enable logging to see more details."
+                )
+                logger.warning("Route '%s' does not start with 'host:', falling back to match without 'host:' prefix", payload)
+            else:
+                logger.debug("Route '%s' does not start with 'host:', falling back to match without 'host:' prefix", payload)
+            route, params = self._router.match(payload[5:])
         if route is None:
-            await session.send_fail(b"unsupported operation for payload: " + payload.encode("utf-8"))
-            return ResponseAction.CLOSE
+            await session.send_fail(_ERR_UNSUPPORTED + payload.encode("utf-8"))
+            return _CLOSE
 
         handler = route.handler
         handler_args: List[Any] = []
         
         if route.is_device_route:
             if device is None:
-                device = self._device_manager.get_selected(session.id)
+                device = self._get_selected(session.id)
             
             if device is None:
                 # device_route() should select any device if not selected
                 # but device_route(prefix_only=True) should fail.
                 if not route.prefix_only:
                     # Try to select any device
-                    devices = self._device_manager.list_devices()
-                    if devices:
-                        device = devices[0] # Select first one
+                    device = self._first_device()
                 else:
-                    await session.send_fail(b"no device specified for device-only command")
-                    return ResponseAction.CLOSE
+                    await session.send_fail(_ERR_NO_DEVICE_SPECIFIED)
+                    return _CLOSE
             
             if device is None:
-                await session.send_fail(b"no device available")
-                return ResponseAction.CLOSE
+                await session.send_fail(_ERR_NO_DEVICE_AVAILABLE)
+                return _CLOSE
             
             handler_args.append(device)
 
         try:
-            token = g_session.set(session)
-            try:
+            if g_session.get(None) is session:
+                # Already bound by SmartSocketSession.run for this connection
                 result = await handler(*handler_args, **params)
-            finally:
-                g_session.reset(token)
+            else:
+                token = g_session.set(session)
+                try:
+                    result = await handler(*handler_args, **params)
+                finally:
+                    g_session.reset(token)
         except Exception:
             logger.exception("Error when dispatching payload %s", payload)
-            await session.send_fail(b"internal error")
-            return ResponseAction.CLOSE
+            await session.send_fail(_ERR_INTERNAL)
+            return _CLOSE
 
         if result is None:
             # default to OK without body
             await session.send_okay()
-            return ResponseAction.CLOSE
-        if result.kind == "OK":
-            await session.send_okay(data=result.data, raw=result.raw)
-        elif result.kind == "FAIL":
-            await session.send_fail(result.data or b"unknown error", raw=result.raw)
-        elif result.kind == "NOOP":
-            pass
-        else:
-            raise ValueError(f"unknown response kind: {result.kind}")
+            return _CLOSE
+        # Unpack the tuple once instead of going through a field accessor per use
+        kind, data, action, raw = result
+        if kind == "OK":
+            await session.send_okay(data=data, raw=raw)
+        elif kind == "FAIL":
+            await session.send_fail(data or _ERR_UNKNOWN, raw=raw)
+        elif kind != "NOOP":
+            raise ValueError(f"unknown response kind: {kind}")
         
-        return result.action
+        return action
 
 
 def route(pattern: str) -> Callable[[Handler], Handler]:
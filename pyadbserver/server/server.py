@@ -21,11 +21,24 @@ class AdbServer:
         port: int = 5037,
         *,
         app: App,
+        reuse_port: bool = False,
+        idle_timeout: Optional[float] = None,
     ) -> None:
+        """
+        :param reuse_port: Set SO_REUSEPORT on the listening socket so that several
+            server processes can listen on the same port and let the kernel spread
+            connections between them. Not supported on Windows.
+        :param idle_timeout: Close connections that send no request for this many
+            seconds, so clients holding kept-alive connections open do not pile up.
+            None (default) never times out.
+        """
         self._host = host
         self._port = port
+        self._reuse_port = reuse_port
+        self._idle_timeout = idle_timeout
         self._server: Optional[asyncio.AbstractServer] = None
         self._stopping: Optional[asyncio.Event] = None
+        self._stop_task: Optional["asyncio.Task[None]"] = None
         self._app = app
         self._app.register(app)
 
@@ -49,7 +62,8 @@ class AdbServer:
             self._stopping = asyncio.Event()
 
         self._server = await asyncio.start_server(
-            self._handle_client, self._host, self._port
+            self._handle_client, self._host, self._port,
+            reuse_port=self._reuse_port,
         )
 
     async def serve_forever(self) -> None:
@@ -77,27 +91,29 @@ class AdbServer:
         """
         if self._stopping is not None:
             self._stopping.set()
-        # If we're not in serve_forever context, also proactively stop the server
-        if self._server is not None:
+        # If we're not in serve_forever context, also proactively stop the server.
+        # A pending stop task is reused instead of spawning one per call.
+        if self._server is not None and (self._stop_task is None or self._stop_task.done()):
             try:
                 loop = asyncio.get_running_loop()
-                loop.create_task(self.stop())
+                self._stop_task = loop.create_task(self.stop())
             except RuntimeError:
                 # No running loop; best effort fallback
                 pass
 
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
-        logger.debug(f"Connected")
+        logger.debug("Connected")
         session = SmartSocketSession(
             reader=reader,
             writer=writer,
             app=self._app,
+            idle_timeout=self._idle_timeout,
         )
         try:
             await session.run()
         finally:
             try:
-                logger.debug(f"Disconnected")
+                logger.debug("Disconnected")
                 writer.close()
                 await writer.wait_closed()
             except Exception:
@@ -1,20 +1,43 @@
 import asyncio
 import logging
-import uuid
-from typing import overload, Optional, TYPE_CHECKING
-from dataclasses import dataclass
+import socket
+import itertools
+from typing import overload, Iterable, Optional, TYPE_CHECKING
 from contextlib import contextmanager
 
-from .routing import ResponseAction
+from .routing import ResponseAction, g_session
 
 if TYPE_CHECKING:
     from .routing import App
 
 logger = logging.getLogger(__name__)
+_CLOSE = ResponseAction.CLOSE
+_KEEP_ALIVE = ResponseAction.KEEP_ALIVE
+# Session ids only need to be unique within this process
+_next_session_id = itertools.count(1).__next__
+
+
+def _set_nodelay(writer: asyncio.StreamWriter) -> None:
+    """
+    Disable Nagle's algorithm so small OKAY/FAIL replies are not held back.
+
+    The default asyncio loops already do this for TCP transports, but custom
+    event loops are not required to.
+    """
+    sock = writer.get_extra_info("socket")
+    if sock is None or sock.family not in (socket.AF_INET, socket.AF_INET6):
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError:
+        pass
+
 
-@dataclass
 class SessionState:
-    selected_device_id: Optional[str] = None
+    __slots__ = ("selected_device_id",)
+
+    def __init__(self, selected_device_id: Optional[str] = None) -> None:
+        self.selected_device_id = selected_device_id
 
 
 class SmartSocketSession:
@@ -25,28 +48,45 @@ class SmartSocketSession:
         *,
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
-        app: 'App'
+        app: 'App',
+        idle_timeout: Optional[float] = None,
     ) -> None:
-        self.id = str(uuid.uuid4())
+        """
+        :param idle_timeout: Seconds to wait for the next request before closing
+            the connection silently. None waits forever.
+        """
+        self.id = str(_next_session_id())
         self._reader = reader
         self._writer = writer
         self._app = app
+        self._idle_timeout = idle_timeout
         self._state = SessionState()
         self.enable_log = True
+        _set_nodelay(writer)
 
     async def run(self) -> None:
+        # Each connection is served by its own task, and so its own context,
+        # so the session only needs to be bound once for all of its requests.
+        g_session.set(self)
         # adb server uses short TCP connection by default
         # but handler can choose to keep the connection alive
         while True:
             try:
-                length_hex = await self._read(4)
+                if self._idle_timeout is None:
+                    length_hex = await self._read(4)
+                else:
+                    length_hex = await asyncio.wait_for(self._read(4), self._idle_timeout)
             except asyncio.IncompleteReadError:
                 await self.send_fail(b"truncated length prefix")
                 return
+            except asyncio.TimeoutError:
+                # Idle client, e.g. one holding a kept-alive connection open
+                return
 
             try:
-                payload_length = int(length_hex.decode("ascii"), 16)
-            except Exception:
+                # int() parses the ASCII bytes directly, no decode needed
+                payload_length = int(length_hex, 16)
+            except ValueError:
                 await self.send_fail(b"bad length prefix")
                 return
 
@@ -63,9 +103,9 @@ class SmartSocketSession:
             action = await self._app.dispatch(payload.decode("utf-8", errors="replace"), self)
             
             # close or keep-alive according to handler's response
-            if action == ResponseAction.CLOSE:
+            if action is _CLOSE:
                 return
-            elif action == ResponseAction.KEEP_ALIVE:
+            elif action is _KEEP_ALIVE:
                 continue
             else:
                 raise ValueError(f"unknown response action: {action}")
@@ -78,24 +118,22 @@ class SmartSocketSession:
     async def send_okay(self, data: Optional[bytes] = None, *, flush: bool = True, raw: bool = False) -> None: ...
 
     async def send_okay(self, data: Optional[bytes] = None, *, flush: bool = True, raw: bool = False) -> None:
-        if data is not None:
+        # Build the whole frame so it goes out in a single write
+        if data is None:
             self.write(b"OKAY")
+        elif raw:
             # raw payload: do not send length prefix
-            if not raw:
-                self.write(f"{len(data):04x}".encode("ascii"))
-            self.write(data)
-            if flush:
-                await self._flush()
+            self.write(b"OKAY" + data)
         else:
-            self.write(b"OKAY")
-            if flush:
-                await self._flush()
+            self.write(b"OKAY%04x%b" % (len(data), data))
+        if flush:
+            await self._flush()
 
     async def send_fail(self, reason: bytes, *, flush: bool = True, raw: bool = False) -> None:
-        self.write(b"FAIL")
-        if not raw:
-            self.write(f"{len(reason):04x}".encode("ascii"))
-        self.write(reason)
+        if raw:
+            self.write(b"FAIL" + reason)
+        else:
+            self.write(b"FAIL%04x%b" % (len(reason), reason))
         if flush:
             await self._flush()
 
@@ -110,8 +148,9 @@ class SmartSocketSession:
 
     async def _read(self, length: int) -> bytes:
         data = await self._reader.readexactly(length)
-        if self.enable_log:
-            logger.debug(f"Recv: {data!r}")
+        # repr() of a large payload is costly, only build it when it is logged
+        if self.enable_log and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Recv: %r", data)
         return data
 
     def write(self, data: bytes) -> None:
@@ -121,10 +160,23 @@ class SmartSocketSession:
         Usually you should use `send_okay` or `send_fail` instead.
         """
         self._writer.write(data)
-        if self.enable_log:
-            logger.debug(f"Send: {data!r}")
+        if self.enable_log and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Send: %r", data)
+
+    def writelines(self, data: Iterable[bytes]) -> None:
+        """
+        Write several buffers at once, e.g. a packet header and its payload.
+
+        Transports that support it send them with a single scatter/gather
+        call instead of one send per buffer.
+        """
+        if self.enable_log and logger.isEnabledFor(logging.DEBUG):
+            data = list(data)
+            for part in data:
+                logger.debug("Send: %r", part)
+        self._writer.writelines(data)
 
     async def _flush(self) -> None:
         await self._writer.drain()
         if self.enable_log:
-            logger.debug(f"Flush")
+            logger.debug("Flush")
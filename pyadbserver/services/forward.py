@@ -1,44 +1,58 @@
 from typing import Dict, TYPE_CHECKING
-from collections import defaultdict
 
-from ..server.routing import OK, FAIL, device_route
+from ..server.routing import OK, FAIL, Response, device_route
 if TYPE_CHECKING:
     from ..transport.device import Device
 
+_FAIL_CANNOT_REBIND = FAIL("cannot rebind existing socket")
+_OK_NO_FORWARDS = OK(b"")
+# Forward commands are answered with two consecutive OKAYs and no length prefix
+_OK_FORWARD = OK(b"OKAY", raw=True)
+
 
 class ForwardService:
     def __init__(self):
-        self.forwards: Dict[str, Dict[str, str]] = defaultdict(dict)
+        # Only forward commands create a device's entry, lookups use .get()
+        self.forwards: Dict[str, Dict[str, str]] = {}
+        # serial -> list-forward response, dropped whenever that device's forwards change
+        self._list_responses: Dict[str, Response] = {}
 
     @device_route("forward:norebind:<local>;<remote>")
     def forward_norebind(self, device: "Device", local: str, remote: str):
-        if local in self.forwards[device.serial]:
-            return FAIL("cannot rebind existing socket")
-        self.forwards[device.serial][local] = remote
-        return OK(b"OKAY", raw=True)
+        forwards = self.forwards.setdefault(device.serial, {})
+        if local in forwards:
+            return _FAIL_CANNOT_REBIND
+        forwards[local] = remote
+        self._list_responses.pop(device.serial, None)
+        return _OK_FORWARD
 
     @device_route("forward:<local>;<remote>")
     def forward(self, device: "Device", local: str, remote: str):
-        self.forwards[device.serial][local] = remote
-        # As for forward commands, two continuous OKAY (b"OKAYOKAY") responses are expected
-        # also no length information
-        return OK(b"OKAY", raw=True)
+        self.forwards.setdefault(device.serial, {})[local] = remote
+        self._list_responses.pop(device.serial, None)
+        return _OK_FORWARD
 
     @device_route("killforward:<local>")
     def killforward(self, device: "Device", local: str):
-        if local in self.forwards[device.serial]:
-            del self.forwards[device.serial][local]
-        return OK(b"OKAY", raw=True)
+        forwards = self.forwards.get(device.serial)
+        if forwards and local in forwards:
+            del forwards[local]
+            self._list_responses.pop(device.serial, None)
+        return _OK_FORWARD
 
     @device_route("killforward-all")
     def killforward_all(self, device: "Device"):
-        self.forwards[device.serial].clear()
-        return OK(b"OKAY", raw=True)
+        if self.forwards.pop(device.serial, None):
+            self._list_responses.pop(device.serial, None)
+        return _OK_FORWARD
 
     @device_route("list-forward")
     def list_forward(self, device: "Device"):
-        lines = [f"{device.serial} {local} {remote}" for local, remote in self.forwards[device.serial].items()]
-        response = "\n".join(lines)
-        if response:
-            response += "\n"
-        return OK(response.encode("utf-8"))
\ No newline at end of file
+        forwards = self.forwards.get(device.serial)
+        if not forwards:
+            return _OK_NO_FORWARDS
+        response = self._list_responses.get(device.serial)
+        if response is None:
+            lines = [f"{device.serial} {local} {remote}" for local, remote in forwards.items()]
+            response = self._list_responses[device.serial] = OK(("\n".join(lines) + "\n").encode("utf-8"))
+        return response
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+import functools
 import io
 import os
 import stat
 import time
 from dataclasses import dataclass
-from typing import BinaryIO, Dict, Iterable, Optional, Union
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple, Union
 
 
 @dataclass
 class FileStat:
+    # Declared by hand, dataclass(slots=True) needs Python 3.10
+    __slots__ = ("mode", "size", "mtime")
+
     mode: int
     size: int
     mtime: int
@@ -17,6 +21,9 @@ class FileStat:
 
 @dataclass
 class Dirent:
+    # One is created per LIST entry, so keep them free of a per-instance __dict__
+    __slots__ = ("name", "mode", "size", "mtime")
+
     name: str
     mode: int
     size: int
@@ -88,39 +95,71 @@ class LocalFileSystem(AbstractFileSystem):
         return open(p, "rb")
 
     def open_for_write(self, path: str, mode: int) -> BinaryIO:
-        # Create parent directories as needed
+        # Create parent directories as needed, makedirs is a no-op if they exist
         p = self._resolve(path)
         parent = os.path.dirname(p)
-        if parent and not os.path.exists(parent):
+        if parent:
             os.makedirs(parent, exist_ok=True)
         # Mode bits only work on *nix, ignored on Windows
-        try:
-            fh = open(p, "wb")
-        finally:
-            pass
-        try:
-            # Best effort to set permission bits
+        perm = mode & 0o7777
+        fd = os.open(p, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), perm)
+        if hasattr(os, "fchmod"):
+            # The mode passed to open() only applies to new files and is masked by umask
             try:
-                os.chmod(p, mode & 0o7777)
-            except Exception:
+                os.fchmod(fd, perm)
+            except OSError:
                 pass
-        finally:
-            pass
-        return fh
+        return os.fdopen(fd, "wb")
 
     def set_mtime(self, path: str, mtime: int) -> None:
         p = self._resolve(path)
-        try:
-            atime = os.stat(p).st_atime
-        except Exception:
-            atime = mtime
-        os.utime(p, (atime, mtime))
+        # adbd sets both timestamps to the pushed mtime, which also saves a stat() per file
+        os.utime(p, (mtime, mtime))
 
     def makedirs(self, path: str) -> None:
         p = self._resolve(path)
         os.makedirs(p, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=4096)
+def _normalize_path(path: str) -> str:
+    """Normalize a MemoryFileSystem path, see MemoryFileSystem._normalize_path."""
+    # Convert Windows path separators
+    path = path.replace("\\", "/")
+    # Remove leading slashes
+    path = path.lstrip("/")
+    # If empty path, return "."
+    if not path:
+        return "."
+    return path
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_path(path: str) -> Tuple[str, ...]:
+    """Split a MemoryFileSystem path into its components, see MemoryFileSystem._split_path."""
+    path = _normalize_path(path)
+    if path == ".":
+        return ()
+    # Filter out empty strings and "."
+    return tuple(p for p in path.split("/") if p and p != ".")
+
+
+class _NodeWriter(io.BytesIO):
+    """BytesIO that stores its content into a MemoryFileSystem file node when closed."""
+
+    def __init__(self, node: "MemoryFileSystem._Node") -> None:
+        super().__init__()
+        self._node = node
+
+    def close(self) -> None:
+        if not self.closed:
+            # On CPython getvalue() hands over the internal buffer instead of
+            # copying it, as long as no memoryview of it is alive.
+            self._node.data = self.getvalue()
+            self._node.mtime = int(time.time())
+        super().close()
+
+
 class MemoryFileSystem(AbstractFileSystem):
     """In-memory file system implementation.
 
@@ -161,28 +200,18 @@ class MemoryFileSystem(AbstractFileSystem):
         """
         # Root directory with mode 755
         self._root = self._Node(mode=stat.S_IFDIR | 0o755)
+        # Canonical path ("a/b/c", "." for the root) -> node, for every node in the tree
+        self._by_path: Dict[str, MemoryFileSystem._Node] = {".": self._root}
         self.auto_create = auto_create
         """If True, auto create missing intermediate directories when opening a file for writing."""
 
     def _normalize_path(self, path: str) -> str:
         """Normalize path, removing redundant slashes and . components."""
-        # Convert Windows path separators
-        path = path.replace("\\", "/")
-        # Remove leading slashes
-        path = path.lstrip("/")
-        # If empty path, return "."
-        if not path:
-            return "."
-        return path
-
-    def _split_path(self, path: str) -> list[str]:
-        """Split path into component list."""
-        path = self._normalize_path(path)
-        if path == ".":
-            return []
-        parts = path.split("/")
-        # Filter out empty strings and "."
-        return [p for p in parts if p and p != "."]
+        return _normalize_path(path)
+
+    def _split_path(self, path: str) -> Tuple[str, ...]:
+        """Split path into component tuple."""
+        return _split_path(path)
 
     def _traverse(self, path: str, create_missing: bool = False, 
                   parent_mode: int = stat.S_IFDIR | 0o755) -> _Node:
@@ -204,6 +233,11 @@ class MemoryFileSystem(AbstractFileSystem):
         
         if not parts:  # Root directory
             return self._root
+
+        # Existing nodes are found with a single lookup, only misses walk the tree
+        node = self._by_path.get("/".join(parts))
+        if node is not None:
+            return node
             
         current = self._root
         
@@ -216,7 +250,7 @@ class MemoryFileSystem(AbstractFileSystem):
             if part not in current.children:
                 if create_missing:
                     # Create intermediate directory
-                    current.children[part] = self._Node(mode=parent_mode)
+                    current.children[part] = self._by_path["/".join(parts[:i + 1])] = self._Node(mode=parent_mode)
                 else:
                     raise FileNotFoundError(f"No such file or directory: {path}")
                     
@@ -285,6 +319,8 @@ class MemoryFileSystem(AbstractFileSystem):
         Returns a special BytesIO object that writes data back to the node on close.
         """
         if self.auto_create:
+            # dirname() rather than the split components: "a/b/" names the directory
+            # "a/b", so it is created here and then rejected as a directory below
             self._traverse(os.path.dirname(path), create_missing=True)
 
         parent, filename = self._get_parent(path)
@@ -293,8 +329,8 @@ class MemoryFileSystem(AbstractFileSystem):
         
         # Create file if it doesn't exist
         if filename not in parent.children:
-            parent.children[filename] = self._Node(mode=stat.S_IFREG | (mode & 0o777))
-            node = parent.children[filename]
+            node = self._Node(mode=stat.S_IFREG | (mode & 0o777))
+            parent.children[filename] = self._by_path["/".join(self._split_path(path))] = node
         else:
             node = parent.children[filename]
             if not node.is_file():
@@ -302,17 +338,7 @@ class MemoryFileSystem(AbstractFileSystem):
             # Update mode
             node.mode = stat.S_IFREG | (mode & 0o777)
             
-        # Create a special BytesIO that writes back data on close
-        buffer = io.BytesIO()
-        original_close = buffer.close
-        
-        def close_with_writeback():
-            node.data = buffer.getvalue()
-            node.mtime = int(time.time())
-            original_close()
-            
-        buffer.close = close_with_writeback
-        return buffer
+        return _NodeWriter(node)
 
     def set_mtime(self, path: str, mtime: int) -> None:
         """Set the modification time of a file or directory."""
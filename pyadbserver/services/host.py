@@ -1,21 +1,40 @@
-from typing import TYPE_CHECKING
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 
 from .. import DEFAULT_SERVER_VERSION
-from ..server.routing import NOOP, ResponseAction, g_session, route, device_route, OK, FAIL
+from ..server.routing import NOOP, Response, ResponseAction, g_session, route, device_route, OK, FAIL
 if TYPE_CHECKING:
     from ..server import AdbServer
     from ..transport.device_manager import DeviceService
     from ..transport.device import Device
 
+# Constant failure responses, encoded once
+_FAIL_NO_DEVICES = FAIL("no devices/emulators found")
+_FAIL_MORE_THAN_ONE_DEVICE = FAIL("more than one device/emulator")
+
 
 class HostService:
     def __init__(self, server: 'AdbServer', device_manager: 'DeviceService') -> None:
         self._adb_server = server
         self._device_manager = device_manager
+        # Responses that never change during the server's lifetime
+        self._version_response = OK(f"{DEFAULT_SERVER_VERSION:04x}".encode("ascii"))
+        self._features_response = OK(b"shell")
+        # Transport ids used by host:tport:*
+        self._tport_responses = {
+            transport_id: OK(transport_id.to_bytes(8, "little"), raw=True, action=ResponseAction.KEEP_ALIVE)
+            for transport_id in (1, 2)
+        }
+        # Device list responses, each with the device fields it was built from.
+        # Devices can be changed in place, so a response is only reused while
+        # those fields are unchanged.
+        self._devices_cache: Optional[Tuple[tuple, Response]] = None
+        self._devices_l_cache: Optional[Tuple[tuple, Response]] = None
+        # host-serial:<serial>:features responses by device id, with the features they were built from
+        self._device_features_cache: Dict[str, Tuple[Tuple[bytes, ...], Response]] = {}
 
     @route("host:version")
     async def version(self):
-        return OK(f"{DEFAULT_SERVER_VERSION:04x}".encode("ascii"))
+        return self._version_response
 
     @route("host:kill")
     async def kill(self):
@@ -24,12 +43,13 @@ class HostService:
 
     @route("host:devices")
     async def devices(self):
-        devices = self._device_manager.list_devices()
-        lines = [f"{d.serial}\t{d.state}" for d in devices]
-        response = "\n".join(lines)
-        if response:
-            response += "\n"
-        return OK(response.encode("utf-8"))
+        key = tuple((d.serial, d.state) for d in self._device_manager.list_devices())
+        cached = self._devices_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        response = OK("".join(f"{serial}\t{state}\n" for serial, state in key).encode("utf-8"))
+        self._devices_cache = (key, response)
+        return response
 
     @route("host:devices-l")
     async def devices_l(self):
@@ -39,15 +59,19 @@ class HostService:
         Format:
         <serial> <state> <properties>
         """
-        devices = self._device_manager.list_devices()
-        lines = []
-        for d in devices:
-            props = " ".join([f"{k}:{v}" for k, v in d.properties.items()])
-            lines.append(f"{d.serial:22s} {d.state:10s} {props}")
-        response = "\n".join(lines)
-        if response:
-            response += "\n"
-        return OK(response.encode("utf-8"))
+        key = tuple(
+            (d.serial, d.state, tuple(d.properties.items()))
+            for d in self._device_manager.list_devices()
+        )
+        cached = self._devices_l_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        response = "".join(
+            f"{serial:22s} {state:10s} {' '.join(f'{k}:{v}' for k, v in props)}\n"
+            for serial, state, props in key
+        )
+        self._devices_l_cache = (key, OK(response.encode("utf-8")))
+        return self._devices_l_cache[1]
 
     @route("host:features")
     async def features(self):
@@ -62,14 +86,20 @@ class HostService:
         Example of features:
         shell_v2,cmd,stat_v2,ls_v2,fixed_push_mkdir,apex,abb,fixed_push_symlink_timestamp,abb_exec,remount_shell,track_app,sendrecv_v2,sendrecv_v2_brotli,sendrecv_v2_lz4,sendrecv_v2_zstd,sendrecv_v2_dry_run_send,openscreen_mdns
         """
-        return OK(b"shell")
+        return self._features_response
 
     @device_route("features")
     async def features_device(self, device: "Device"):
         """
         Returns the list of features supported by the device.
         """
-        return OK(b",".join(device.features))
+        features = tuple(device.features)
+        cached = self._device_features_cache.get(device.id)
+        if cached is not None and cached[0] == features:
+            return cached[1]
+        response = OK(b",".join(features))
+        self._device_features_cache[device.id] = (features, response)
+        return response
 
     ########## Transport Commands ##########
     # Before the adb client executes any actual commands (such as shell, install, ...)
@@ -81,8 +111,11 @@ class HostService:
         <<< OKAY
         <<< 02 00 00 00 00 00 00 00  // a 8-byte transport id (raw data, not ASCII string)
         """
-        data = transport_id.to_bytes(8, "little")
-        return OK(data, raw=True, action=ResponseAction.KEEP_ALIVE)
+        response = self._tport_responses.get(transport_id)
+        if response is None:
+            data = transport_id.to_bytes(8, "little")
+            response = OK(data, raw=True, action=ResponseAction.KEEP_ALIVE)
+        return response
     
     @route("host:tport:serial:<serial>")
     async def transport_serial(self, serial: str):
@@ -129,14 +162,14 @@ class HostService:
         """
         devices = self._device_manager.list_devices()
         if not devices:
-            return FAIL("no devices/emulators found")
+            return _FAIL_NO_DEVICES
         if len(devices) > 1:
-            return FAIL("more than one device/emulator")
+            return _FAIL_MORE_THAN_ONE_DEVICE
         session = g_session.get()
         try:
             self._device_manager.select_device(session.id)
         except Exception:
-            return FAIL("no devices/emulators found")
+            return _FAIL_NO_DEVICES
         return OK(action=ResponseAction.KEEP_ALIVE)
 
     @route("host:transport-usb")
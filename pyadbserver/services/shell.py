@@ -28,17 +28,32 @@ class ShellProtocolId(IntEnum):
 
 # Shell Protocol v2 包格式: [1字节ID][4字节长度(little-endian)][数据]
 SHELL_PROTOCOL_HEADER_SIZE = 5
+# Format: B=uint8, I=uint32 (little-endian)
+_SHELL_HEADER = struct.Struct("<BI")
+
+# Plain int ids for the output loops, which pack headers themselves, so no
+# enum member is looked up and converted per packet
+_ID_STDOUT: int = int(ShellProtocolId.STDOUT)
+_ID_STDERR: int = int(ShellProtocolId.STDERR)
+
+# Upper bound for one read of subprocess output. read() returns whatever is
+# already available, so a large bound does not delay interactive output.
+_READ_CHUNK = 64 * 1024
+
+# Constant failure responses, encoded once
+_FAIL_INTERACTIVE_SHELL = FAIL("interactive shell is not supported")
+_FAIL_INTERACTIVE_SHELL_V2 = FAIL("interactive shellv2 is not supported")
+_FAIL_EXEC = FAIL("exec command is not supported")
 
 
 def encode_shell_packet(packet_id: ShellProtocolId, data: bytes = b"") -> bytes:
-    length = len(data)
-    # Format: B=uint8, I=uint32 (little-endian)
-    header = struct.pack("<BI", packet_id, length)
-    return header + data
+    return _SHELL_HEADER.pack(packet_id, len(data)) + data
 
 
-def decode_shell_packet_header(header: bytes) -> Tuple[ShellProtocolId, int]:
-    packet_id, length = struct.unpack("<BI", header)
+def decode_shell_packet_header(header: bytes, offset: int = 0) -> Tuple[ShellProtocolId, int]:
+    # unpack_from reads the header in place, so a whole packet or stream buffer
+    # can be passed without slicing out the first 5 bytes
+    packet_id, length = _SHELL_HEADER.unpack_from(header, offset)
     return ShellProtocolId(packet_id), length
 
 
@@ -53,7 +68,7 @@ class LocalShellService:
 
     @device_route("shell:")
     async def shell_interactive(self, device: "Device"):
-        return FAIL("interactive shell is not supported")
+        return _FAIL_INTERACTIVE_SHELL
 
     @device_route("shell:<cmd>")
     async def shell_run(self, device: "Device", cmd: str):
@@ -62,7 +77,7 @@ class LocalShellService:
 
     @device_route("shell,v2:")
     async def shell_v2_interactive(self, device: "Device"):
-        return FAIL("interactive shellv2 is not supported")
+        return _FAIL_INTERACTIVE_SHELL_V2
 
     @device_route("shell,v2:<cmd>")
     async def shell_v2_run(self, device: "Device", cmd: str):
@@ -71,7 +86,7 @@ class LocalShellService:
 
     @device_route("exec:<cmd>")
     async def exec_run(self, device: "Device", cmd: str):
-        return FAIL("exec command is not supported")
+        return _FAIL_EXEC
 
     # ===== Core Implementation =====
 
@@ -133,17 +148,17 @@ class LocalShellService:
     async def _handle_protocol_subprocess(self, session: 'SmartSocketSession', proc: asyncio.subprocess.Process):
         """Handle subprocess using shell protocol (non-interactive)"""
         
+        # Header and payload are passed to one writelines() call: the payload is not
+        # copied into a new packet, and stdout/stderr packets cannot interleave.
         async def read_stdout():
             """Read stdout and send via protocol"""
             if proc.stdout:
                 try:
                     while True:
-                        # Use 8KB buffer for non-interactive commands
-                        chunk = await proc.stdout.read(8192)
+                        chunk = await proc.stdout.read(_READ_CHUNK)
                         if not chunk:
                             break
-                        packet = encode_shell_packet(ShellProtocolId.STDOUT, chunk)
-                        session.write(packet)
+                        session.writelines((_SHELL_HEADER.pack(_ID_STDOUT, len(chunk)), chunk))
                         await session._flush()
                 except Exception:
                     pass
@@ -153,18 +168,22 @@ class LocalShellService:
             if proc.stderr:
                 try:
                     while True:
-                        # Use 8KB buffer for non-interactive commands
-                        chunk = await proc.stderr.read(8192)
+                        chunk = await proc.stderr.read(_READ_CHUNK)
                         if not chunk:
                             break
-                        packet = encode_shell_packet(ShellProtocolId.STDERR, chunk)
-                        session.write(packet)
+                        session.writelines((_SHELL_HEADER.pack(_ID_STDERR, len(chunk)), chunk))
                         await session._flush()
                 except Exception:
                     pass
 
-        # Read stdout and stderr concurrently
-        await asyncio.gather(read_stdout(), read_stderr())
+        # Read stdout and stderr concurrently. stdout is read in this task, so only
+        # stderr needs a task of its own.
+        stderr_task = asyncio.ensure_future(read_stderr())
+        try:
+            await read_stdout()
+            await stderr_task
+        finally:
+            stderr_task.cancel()
 
         # Wait for process to exit
         exit_code = await proc.wait()
@@ -184,8 +203,7 @@ class LocalShellService:
             if proc.stdout:
                 try:
                     while True:
-                        # Use 8KB buffer for non-interactive commands
-                        chunk = await proc.stdout.read(8192)
+                        chunk = await proc.stdout.read(_READ_CHUNK)
                         if not chunk:
                             break
                         session.write(chunk)
@@ -197,7 +215,7 @@ class LocalShellService:
             if proc.stderr:
                 try:
                     while True:
-                        chunk = await proc.stderr.read(8192)
+                        chunk = await proc.stderr.read(_READ_CHUNK)
                         if not chunk:
                             break
                         session.write(chunk)
@@ -27,7 +27,17 @@ ID_OKAY = b"OKAY"
 ID_FAIL = b"FAIL"
 ID_QUIT = b"QUIT"
 
+SYNC_DATA_MAX = 64 * 1024
+"""Maximum payload of a single DATA packet."""
+# Files are read in larger blocks and split into DATA packets, so there are
+# fewer reads and flushes per transfer
+_READ_BLOCK = 16 * SYNC_DATA_MAX
+
 UINT32 = struct.Struct("<I")
+# Precompiled layouts of the sync packets, so the format is not parsed on every call
+_REQUEST = struct.Struct("<4sI")
+_DENT = struct.Struct("<4sIIII")
+_STAT = struct.Struct("<4sIII")
 
 
 async def _read_exact(session: 'SmartSocketSession', length: int) -> bytes:
@@ -35,7 +45,7 @@ async def _read_exact(session: 'SmartSocketSession', length: int) -> bytes:
 
 
 def _pack_request(id4: bytes, value: int) -> bytes:
-    return id4 + UINT32.pack(value)
+    return _REQUEST.pack(id4, value)
 
 
 class SyncV1Service:
@@ -47,6 +57,13 @@ class SyncV1Service:
 
     def __init__(self, fs: AbstractFileSystem) -> None:
         self._fs = fs
+        # Request id -> handler, one dict lookup instead of comparing against each id in turn
+        self._handlers = {
+            ID_LIST: self._handle_list,
+            ID_STAT: self._handle_stat,
+            ID_RECV: self._handle_recv,
+            ID_SEND: self._handle_send,
+        }
 
     @device_route("sync:")
     async def sync_entry(self, device: "Device"):
@@ -64,49 +81,49 @@ class SyncV1Service:
                 return
             if len(header) < 8:
                 return
-            cmd = header[:4]
-            length = UINT32.unpack_from(header, 4)[0]
+            cmd, length = _REQUEST.unpack(header)
 
             if cmd == ID_QUIT:
                 return
 
+            handler = self._handlers.get(cmd)
             try:
-                if cmd in (ID_LIST, ID_STAT, ID_RECV, ID_SEND):
-                    path = b""
-                    if length > 0:
-                        path = await _read_exact(session, length)
-                    # path 为 utf-8（不含终止符）
-                    path_str = path.decode('utf-8', errors='replace')
-
-                    if cmd == ID_LIST:
-                        await self._handle_list(session, path_str)
-                        return
-                    elif cmd == ID_STAT:
-                        await self._handle_stat(session, path_str)
-                    elif cmd == ID_RECV:
-                        await self._handle_recv(session, path_str)
-                    elif cmd == ID_SEND:
-                        await self._handle_send(session, path_str)
-                else:
+                if handler is None:
                     await self._send_fail(session, b"unknown sync id")
                     return
+                path = b""
+                if length > 0:
+                    path = await _read_exact(session, length)
+                # path 为 utf-8（不含终止符）
+                await handler(session, path.decode('utf-8', errors='replace'))
+                if cmd == ID_LIST:
+                    return
             except Exception as e:
                 await self._send_fail(session, str(e).encode('utf-8', errors='replace'))
                 return
 
     async def _handle_list(self, session: 'SmartSocketSession', path: str) -> None:
+        # DENT records are small, send them in batches rather than one flush per entry
+        batch = []
+        batch_size = 0
         for dent in self._fs.iterdir(path):
-            payload = struct.pack(
-                "<4sIIII",
+            name = dent.name.encode('utf-8')
+            batch.append(_DENT.pack(
                 ID_DENT,
                 dent.mode,
                 dent.size,
                 dent.mtime,
-                len(dent.name.encode('utf-8')),
-            ) + dent.name.encode('utf-8')
-            session.write(payload)
-            await session._flush()
-        session.write(_pack_request(ID_DONE, 0))
+                len(name),
+            ))
+            batch.append(name)
+            batch_size += _DENT.size + len(name)
+            if batch_size >= SYNC_DATA_MAX:
+                session.write(b"".join(batch))
+                await session._flush()
+                batch.clear()
+                batch_size = 0
+        batch.append(_pack_request(ID_DONE, 0))
+        session.write(b"".join(batch))
         await session._flush()
 
     async def _handle_stat(self, session: 'SmartSocketSession', path: str) -> None:
@@ -114,33 +131,34 @@ class SyncV1Service:
             st = self._fs.stat(path)
         except FileNotFoundError:
             st = FileStat(mode=0, size=0, mtime=0)
-        payload = struct.pack("<4sIII", ID_STAT, st.mode, st.size, st.mtime)
+        payload = _STAT.pack(ID_STAT, st.mode, st.size, st.mtime)
         session.write(payload)
         await session._flush()
 
     async def _handle_recv(self, session: 'SmartSocketSession', path: str) -> None:
         with self._fs.open_for_read(path) as f:
             with session.suppress_log():
-                logger.debug(f"Start RECV {path}")
+                logger.debug("Start RECV %s", path)
                 while True:
-                    chunk = f.read(64 * 1024)
-                    if not chunk:
+                    block = f.read(_READ_BLOCK)
+                    if not block:
                         break
-                    session.write(_pack_request(ID_DATA, len(chunk)))
-                    session.write(chunk)
+                    view = memoryview(block)
+                    for i in range(0, len(view), SYNC_DATA_MAX):
+                        chunk = view[i:i + SYNC_DATA_MAX]
+                        session.writelines((_pack_request(ID_DATA, len(chunk)), chunk))
                     await session._flush()
         session.write(_pack_request(ID_DONE, 0))
         await session._flush()
 
     async def _handle_send(self, session: 'SmartSocketSession', spec: str) -> None:
         # spec: "path,mode"
-        comma = spec.rfind(',')
-        if comma == -1:
+        path, sep, mode_str = spec.rpartition(',')
+        if not sep:
             await self._send_fail(session, b"bad SEND spec")
             return
-        path = spec[:comma]
         try:
-            mode = int(spec[comma + 1:], 10)
+            mode = int(mode_str, 10)
         except ValueError:
             await self._send_fail(session, b"bad mode")
             return
@@ -148,12 +166,11 @@ class SyncV1Service:
         f = self._fs.open_for_write(path, mode)
         try:
             mtime: int | None = None
-            logger.debug(f"Start SEND {path}")
+            logger.debug("Start SEND %s", path)
             while True:
                 with session.suppress_log():
                     header = await _read_exact(session, 8)
-                    cmd = header[:4]
-                    length = UINT32.unpack_from(header, 4)[0]
+                    cmd, length = _REQUEST.unpack(header)
                     if cmd == ID_DATA:
                         if length > 0:
                             data = await _read_exact(session, length)
@@ -177,9 +194,7 @@ class SyncV1Service:
         await session._flush()
 
     async def _send_fail(self, session: 'SmartSocketSession', message: bytes) -> None:
-        session.write(_pack_request(ID_FAIL, len(message)))
-        if message:
-            session.write(message)
+        session.writelines((_pack_request(ID_FAIL, len(message)), message))
         await session._flush()
 
 
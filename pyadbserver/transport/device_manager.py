@@ -6,6 +6,14 @@ from .device import Device
 
 
 class DeviceService(Protocol):
+    """
+    Source of the devices exposed by the server.
+
+    Implementations may also provide `first_device() -> Optional[Device]`,
+    returning what `list_devices()[0]` would without building the list.
+    It is used to pick a device for requests that did not select one.
+    """
+
     def list_devices(self) -> List[Device]:
         ...
 
@@ -35,6 +43,9 @@ class SingleDeviceService:
     def list_devices(self) -> List[Device]:
         return [self._device] if self._device else []
 
+    def first_device(self) -> Optional[Device]:
+        return self._device
+
     def get_device(self, serial: str) -> Optional[Device]:
         if self._device and self._device.serial == serial:
             return self._device
@@ -0,0 +1,103 @@
+"""File system tests
+
+Tests for MemoryFileSystem paths and its node index
+"""
+
+import sys
+import os
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyadbserver.services import MemoryFileSystem
+
+
+def _walk(node, prefix=""):
+    """Yield (canonical path, node) for every node below `node` by walking the tree."""
+    for name, child in (node.children or {}).items():
+        path = f"{prefix}/{name}" if prefix else name
+        yield path, child
+        yield from _walk(child, path)
+
+
+class TestMemoryFileSystemIndex(unittest.TestCase):
+    """Test that the path index stays consistent with the tree"""
+
+    def setUp(self):
+        self.fs = MemoryFileSystem(auto_create=True)
+
+    def _write(self, path, data=b"data"):
+        with self.fs.open_for_write(path, 0o644) as f:
+            f.write(data)
+
+    def assertIndexConsistent(self):
+        expected = {".": self.fs._root}
+        expected.update(_walk(self.fs._root))
+        self.assertEqual(self.fs._by_path.keys(), expected.keys())
+        for path, node in expected.items():
+            self.assertIs(self.fs._by_path[path], node, path)
+
+    def test_create_files_and_directories(self):
+        """Test that files, created parents and makedirs() are all indexed"""
+        self._write("/data/a/b.txt")
+        self._write("data/c.txt")
+        self.fs.makedirs("/data/x/y")
+        self.fs.makedirs("/data/x")
+        self.assertIndexConsistent()
+        self.assertIn("data/a/b.txt", self.fs._by_path)
+        self.assertIn("data/x/y", self.fs._by_path)
+
+    def test_overwrite(self):
+        """Test that rewriting a file keeps its node and index entry"""
+        self._write("data/f.txt", b"one")
+        node = self.fs._by_path["data/f.txt"]
+        self._write("/data//f.txt", b"two")
+        self.assertIs(self.fs._by_path["data/f.txt"], node)
+        self.assertIndexConsistent()
+        with self.fs.open_for_read("data/f.txt") as f:
+            self.assertEqual(f.read(), b"two")
+
+    def test_equivalent_paths(self):
+        """Test that different spellings of a path resolve to the same node"""
+        self._write("data/sub/f.txt")
+        node = self.fs._by_path["data/sub/f.txt"]
+        for path in ("/data/sub/f.txt", "data//sub/f.txt", "data/./sub/f.txt", "data\\sub\\f.txt"):
+            self.assertIs(self.fs._traverse(path), node, path)
+
+    def test_missing_path(self):
+        """Test that a missing path is not added to the index"""
+        self._write("data/f.txt")
+        with self.assertRaises(FileNotFoundError):
+            self.fs.stat("data/missing")
+        self.assertNotIn("data/missing", self.fs._by_path)
+        self.assertIndexConsistent()
+
+
+class TestMemoryFileSystemWritePaths(unittest.TestCase):
+    """Test open_for_write on paths that name a directory"""
+
+    def setUp(self):
+        self.fs = MemoryFileSystem(auto_create=True)
+
+    def test_trailing_separator(self):
+        """Test that a path ending in a separator is rejected as a directory"""
+        with self.assertRaises(IsADirectoryError):
+            self.fs.open_for_write("data/dir/", 0o644)
+        self.assertTrue(self.fs._traverse("data/dir").is_dir())
+
+    def test_trailing_dot(self):
+        """Test that a path ending in a dot component is rejected as a directory"""
+        with self.assertRaises(IsADirectoryError):
+            self.fs.open_for_write("data/dir/.", 0o644)
+        self.assertTrue(self.fs._traverse("data/dir").is_dir())
+
+    def test_existing_directory(self):
+        """Test that an existing directory cannot be opened for writing"""
+        self.fs.makedirs("data/dir")
+        with self.assertRaises(IsADirectoryError):
+            self.fs.open_for_write("data/dir", 0o644)
+
+
+if __name__ == "__main__":
+    unittest.main()
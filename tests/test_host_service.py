@@ -0,0 +1,72 @@
+"""Host service tests
+
+Tests for host:* responses that do not need an adb client
+"""
+
+import asyncio
+import sys
+import os
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyadbserver.server import App, AdbServer
+from pyadbserver.services.host import HostService
+from pyadbserver.transport.device import Device
+from pyadbserver.transport.device_manager import SingleDeviceService
+
+
+class TestDeviceListResponses(unittest.TestCase):
+    """Test that cached device list responses follow changes to the device"""
+
+    def setUp(self):
+        self.device = Device(id="1", serial="s1", properties={"model": "m1"})
+        manager = SingleDeviceService(device=self.device)
+        app = App(device_manager=manager)
+        self.host = HostService(AdbServer(app=app, port=0), manager)
+
+    def test_devices_cached(self):
+        """Test that an unchanged device list reuses the response"""
+        first = asyncio.run(self.host.devices())
+        self.assertEqual(first.data, b"s1\tdevice\n")
+        self.assertIs(asyncio.run(self.host.devices()), first)
+
+    def test_devices_state_change(self):
+        """Test that host:devices reflects a device state changed in place"""
+        asyncio.run(self.host.devices())
+        self.device.state = "offline"
+        self.assertEqual(asyncio.run(self.host.devices()).data, b"s1\toffline\n")
+
+    def test_devices_l_changes(self):
+        """Test that host:devices-l reflects state and property changes"""
+        first = asyncio.run(self.host.devices_l()).data
+        self.assertTrue(first.startswith(b"s1 "))
+        self.assertTrue(first.endswith(b"device     model:m1\n"))
+
+        self.device.state = "offline"
+        self.assertTrue(asyncio.run(self.host.devices_l()).data.endswith(b"offline    model:m1\n"))
+
+        self.device.properties["model"] = "m2"
+        self.assertTrue(asyncio.run(self.host.devices_l()).data.endswith(b"offline    model:m2\n"))
+
+
+class TestDeviceFeatures(unittest.TestCase):
+    """Test the per-device features response"""
+
+    def test_features_change(self):
+        """Test that features appended to a device are reported"""
+        device = Device(id="1", serial="s1", features=[b"shell_v2"])
+        manager = SingleDeviceService(device=device)
+        host = HostService(AdbServer(app=App(device_manager=manager), port=0), manager)
+
+        first = asyncio.run(host.features_device(device))
+        self.assertEqual(first.data, b"shell_v2")
+        self.assertIs(asyncio.run(host.features_device(device)), first)
+
+        device.features.append(b"cmd")
+        self.assertEqual(asyncio.run(host.features_device(device)).data, b"shell_v2,cmd")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,433 @@
+"""Routing tests
+
+Tests for route pattern matching in the Router
+"""
+
+import asyncio
+import sys
+import types
+import os
+import unittest
+import warnings
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyadbserver.server import routing
+from pyadbserver.server.routing import App, Router, route, device_route
+from pyadbserver.transport.device import Device
+from pyadbserver.transport.device_manager import SingleDeviceService
+
+
+def _noop():
+    return None
+
+
+class TestRouterMatch(unittest.TestCase):
+    """Test Router.match on static and placeholder patterns"""
+
+    def setUp(self):
+        self.router = Router()
+        for pattern in (
+            "host:version",
+            "host:devices",
+            "host:devices-l",
+            "host:transport:<serial>",
+            "shell:",
+            "shell:<cmd>",
+            "forward:<local>;<remote>",
+            "forward:norebind:<local>;<remote>",
+        ):
+            self.router.add_route(pattern, _noop)
+
+    def test_static_match(self):
+        """Test exact match of a pattern without placeholders"""
+        route, params = self.router.match("host:devices")
+        self.assertIsNotNone(route)
+        self.assertEqual(route.pattern, "host:devices")
+        self.assertEqual(params, {})
+
+    def test_static_prefix_does_not_match(self):
+        """Test that static patterns only match the whole payload"""
+        route, _ = self.router.match("host:devices-l")
+        self.assertEqual(route.pattern, "host:devices-l")
+        route, _ = self.router.match("host:dev")
+        self.assertIsNone(route)
+
+    def test_placeholder_match(self):
+        """Test extracting a trailing placeholder"""
+        route, params = self.router.match("shell:echo hi")
+        self.assertEqual(route.pattern, "shell:<cmd>")
+        self.assertEqual(params, {"cmd": "echo hi"})
+
+    def test_empty_placeholder(self):
+        """Test that a placeholder never matches an empty string"""
+        route, params = self.router.match("shell:")
+        self.assertEqual(route.pattern, "shell:")
+        self.assertEqual(params, {})
+
+    def test_placeholder_with_colon(self):
+        """Test placeholder values containing ':'"""
+        route, params = self.router.match("host:transport:127.0.0.1:5555")
+        self.assertEqual(route.pattern, "host:transport:<serial>")
+        self.assertEqual(params, {"serial": "127.0.0.1:5555"})
+
+    def test_longer_pattern_wins(self):
+        """Test that the more specific (longer) pattern is preferred"""
+        route, params = self.router.match("forward:norebind:tcp:1;tcp:2")
+        self.assertEqual(route.pattern, "forward:norebind:<local>;<remote>")
+        self.assertEqual(params, {"local": "tcp:1", "remote": "tcp:2"})
+
+        route, params = self.router.match("forward:tcp:1;tcp:2")
+        self.assertEqual(route.pattern, "forward:<local>;<remote>")
+        self.assertEqual(params, {"local": "tcp:1", "remote": "tcp:2"})
+
+    def test_pattern_starting_with_placeholder(self):
+        """Test patterns without a literal first segment against other patterns"""
+        router = Router()
+        router.add_route("host:<rest>", _noop)
+        router.add_route("<prefix>:transport:<serial>", _noop)
+
+        route, params = router.match("host:transport:abc")
+        self.assertEqual(route.pattern, "<prefix>:transport:<serial>")
+        self.assertEqual(params, {"prefix": "host", "serial": "abc"})
+
+        route, params = router.match("host:version")
+        self.assertEqual(route.pattern, "host:<rest>")
+
+        route, params = router.match("other:transport:abc")
+        self.assertEqual(route.pattern, "<prefix>:transport:<serial>")
+
+    def test_malformed_pattern(self):
+        """Test that an unclosed placeholder is rejected at registration"""
+        with self.assertRaises(ValueError):
+            self.router.add_route("shell:<cmd", _noop)
+
+    def test_compiled_pattern_shared(self):
+        """Test that routers registering the same pattern share the compiled regex"""
+        router = Router()
+        router.add_route("shell:<cmd>", _noop)
+        route, _ = router.match("shell:ls")
+        own, _ = self.router.match("shell:ls")
+        self.assertIs(route.regex, own.regex)
+
+    def test_no_match(self):
+        """Test unknown payload"""
+        route, params = self.router.match("host:unknown")
+        self.assertIsNone(route)
+        self.assertEqual(params, {})
+
+    def test_first_registration_wins(self):
+        """Test that registering the same pattern twice keeps the first handler"""
+        router = Router()
+        router.add_route("host:version", lambda: "first")
+        router.add_route("host:version", lambda: "second")
+        route, _ = router.match("host:version")
+        self.assertEqual(asyncio.run(route.handler()), "first")
+
+    def test_static_wins_over_longer_pattern(self):
+        """Test that an exact static pattern wins over a longer placeholder pattern"""
+        for static_first in (True, False):
+            router = Router()
+            routes = [("host:features", _noop), ("host:<name>ures", _noop)]
+            for pattern, handler in (routes if static_first else routes[::-1]):
+                router.add_route(pattern, handler)
+            route, params = router.match("host:features")
+            self.assertEqual(route.pattern, "host:features")
+            self.assertEqual(params, {})
+            # The placeholder pattern still matches other payloads
+            route, params = router.match("host:myfeatures")
+            self.assertEqual(route.pattern, "host:<name>ures")
+            self.assertEqual(params, {"name": "myfeat"})
+
+
+class TestRouterMatchCache(unittest.TestCase):
+    """Test memoization of placeholder route matches"""
+
+    def test_repeated_match(self):
+        """Test that a repeated payload returns the same result"""
+        router = Router()
+        router.add_route("host-serial:<serial>:features", _noop)
+        first = router.match("host-serial:s-1:features")
+        second = router.match("host-serial:s-1:features")
+        self.assertIn("host-serial:s-1:features", router._match_cache)
+        self.assertIs(first[0], second[0])
+        self.assertEqual(second[1], {"serial": "s-1"})
+
+    def test_params_read_only(self):
+        """Test that callers cannot change the params returned for a cached match"""
+        router = Router()
+        router.add_route("host-serial:<serial>:features", _noop)
+        _, params = router.match("host-serial:s-1:features")
+        with self.assertRaises(TypeError):
+            params["serial"] = "other"  # type: ignore[index]
+        self.assertEqual(router.match("host-serial:s-1:features")[1], {"serial": "s-1"})
+
+    def test_open_ended_route_not_cached(self):
+        """Test that matches of a route ending in a placeholder are not memoized"""
+        router = Router()
+        router.add_route("shell:<cmd>", _noop)
+        route, params = router.match("shell:ls")
+        self.assertEqual(route.pattern, "shell:<cmd>")
+        self.assertEqual(params, {"cmd": "ls"})
+        self.assertEqual(router._match_cache, {})
+
+    def test_long_payload_not_cached(self):
+        """Test that payloads longer than MATCH_CACHE_MAX_PAYLOAD are not memoized"""
+        router = Router()
+        router.add_route("host-serial:<serial>:features", _noop)
+        serial = "s" * routing.MATCH_CACHE_MAX_PAYLOAD
+        route, params = router.match(f"host-serial:{serial}:features")
+        self.assertEqual(route.pattern, "host-serial:<serial>:features")
+        self.assertEqual(params, {"serial": serial})
+        self.assertEqual(router._match_cache, {})
+
+    def test_add_route_invalidates(self):
+        """Test that a newly added, more specific route is picked up"""
+        router = Router()
+        router.add_route("forward:<local>;<remote>", _noop)
+        route, _ = router.match("forward:norebind:tcp:1;tcp:2")
+        self.assertEqual(route.pattern, "forward:<local>;<remote>")
+
+        router.add_route("forward:norebind:<local>;<remote>", _noop)
+        route, _ = router.match("forward:norebind:tcp:1;tcp:2")
+        self.assertEqual(route.pattern, "forward:norebind:<local>;<remote>")
+
+    def test_cache_is_bounded(self):
+        """Test that the cache does not grow past MATCH_CACHE_SIZE"""
+        router = Router()
+        router.add_route("host-serial:<serial>:features", _noop)
+        for i in range(routing.MATCH_CACHE_SIZE + 10):
+            router.match(f"host-serial:s-{i}:features")
+        self.assertEqual(len(router._match_cache), routing.MATCH_CACHE_SIZE)
+        self.assertNotIn("host-serial:s-0:features", router._match_cache)
+
+
+class TestRouteHandlers(unittest.TestCase):
+    """Test that sync and async handlers are both awaitable after registration"""
+
+    def test_async_handler_stored_directly(self):
+        """Test that coroutine functions are not wrapped"""
+        async def handler():
+            return "async"
+        router = Router()
+        router.add_route("host:a", handler)
+        route, _ = router.match("host:a")
+        self.assertIs(route.handler, handler)
+        self.assertEqual(asyncio.run(route.handler()), "async")
+
+    def test_sync_handler(self):
+        """Test that a sync handler's return value is passed through"""
+        router = Router()
+        router.add_route("host:b", lambda: "sync")
+        route, _ = router.match("host:b")
+        self.assertEqual(asyncio.run(route.handler()), "sync")
+
+    def test_sync_handler_returning_awaitable(self):
+        """Test that a sync handler returning a coroutine is awaited"""
+        async def inner():
+            return "inner"
+        router = Router()
+        router.add_route("host:c", lambda: inner())
+        route, _ = router.match("host:c")
+        self.assertEqual(asyncio.run(route.handler()), "inner")
+
+
+class _BaseService:
+    @route("host:base")
+    async def base(self):
+        return "base"
+
+    @route("host:overridden")
+    async def overridden(self):
+        return "base"
+
+
+class _DerivedService(_BaseService):
+    def overridden(self):
+        return "derived"
+
+    @device_route("shell:<cmd>", prefix_only=True)
+    async def shell(self, device, cmd):
+        return cmd
+
+    def helper(self):
+        return None
+
+
+class TestAppRegister(unittest.TestCase):
+    """Test collecting decorated methods in App.register"""
+
+    def setUp(self):
+        self.app = App(device_manager=SingleDeviceService())
+        self.app.register(_DerivedService())
+
+    def test_inherited_route(self):
+        """Test that routes declared on a base class are registered"""
+        r, _ = self.app._router.match("host:base")
+        self.assertIsNotNone(r)
+        self.assertEqual(asyncio.run(r.handler()), "base")
+
+    def test_override_without_decorator(self):
+        """Test that an undecorated override hides the base class route"""
+        r, _ = self.app._router.match("host:overridden")
+        self.assertIsNone(r)
+
+    def test_device_route_flags(self):
+        """Test that device route flags are carried over"""
+        r, params = self.app._router.match("shell:ls")
+        self.assertTrue(r.is_device_route)
+        self.assertTrue(r.prefix_only)
+        self.assertEqual(asyncio.run(r.handler(None, **params)), "ls")
+
+    def test_route_methods_per_class(self):
+        """Test collecting the route methods of each class, without adding attributes to it"""
+        base = routing._route_methods(_BaseService)
+        derived = routing._route_methods(_DerivedService)
+        self.assertEqual({m[0] for m in base}, {"base", "overridden"})
+        self.assertEqual({m[0] for m in derived}, {"base", "shell"})
+        self.assertNotIn("__route_methods__", vars(_DerivedService))
+
+    def test_class_changed_after_register(self):
+        """Test that routes added or replaced on a class after registration are picked up"""
+        class Service:
+            @route("host:old")
+            async def handler(self):
+                return "old"
+
+        App(device_manager=SingleDeviceService()).register(Service())
+
+        async def handler(self):
+            return "new"
+        Service.handler = route("host:new")(handler)
+
+        async def added(self):
+            return "added"
+        Service.added = route("host:added")(added)
+
+        app = App(device_manager=SingleDeviceService())
+        app.register(Service())
+        self.assertIsNone(app._router.match("host:old")[0])
+        r, _ = app._router.match("host:new")
+        self.assertEqual(asyncio.run(r.handler()), "new")
+        r, _ = app._router.match("host:added")
+        self.assertEqual(asyncio.run(r.handler()), "added")
+
+    def test_module_routes(self):
+        """Test registering route functions defined on a module"""
+        module = types.ModuleType("routes")
+
+        @route("host:module")
+        async def handler():
+            return "module"
+        module.handler = handler
+
+        app = App(device_manager=SingleDeviceService())
+        app.register(module)
+        r, _ = app._router.match("host:module")
+        self.assertIsNotNone(r)
+        self.assertEqual(asyncio.run(r.handler()), "module")
+
+    def test_instance_attribute_routes(self):
+        """Test that routes set on an instance are registered and shadow class attributes"""
+        service = _BaseService()
+
+        async def instance_route():
+            return "instance"
+        service.extra = route("host:instance")(instance_route)
+        service.base = lambda: "shadowed"
+
+        app = App(device_manager=SingleDeviceService())
+        app.register(service)
+        r, _ = app._router.match("host:instance")
+        self.assertEqual(asyncio.run(r.handler()), "instance")
+        # The undecorated instance attribute hides the class route, as getattr() would
+        self.assertIsNone(app._router.match("host:base")[0])
+        self.assertIsNotNone(app._router.match("host:overridden")[0])
+
+
+class _ListOnlyDeviceService:
+    """Device service without first_device(), like third-party implementations"""
+
+    def __init__(self, device=None):
+        self._devices = [device] if device else []
+
+    def list_devices(self):
+        return list(self._devices)
+
+    def get_device(self, serial):
+        return None
+
+    def get_selected(self, session_id):
+        return None
+
+
+class TestAppFirstDevice(unittest.TestCase):
+    """Test picking a device for device routes without a selection"""
+
+    def setUp(self):
+        self.device = Device(id="1", serial="emulator-5554")
+
+    def test_first_device(self):
+        """Test that the device service's first_device() is used"""
+        manager = SingleDeviceService(device=self.device)
+        app = App(device_manager=manager)
+        self.assertIs(app._first_device(), self.device)
+        self.assertEqual(app._first_device, manager.first_device)
+
+    def test_list_devices_fallback(self):
+        """Test falling back to list_devices() when first_device() is missing"""
+        app = App(device_manager=_ListOnlyDeviceService(self.device))
+        self.assertIs(app._first_device(), self.device)
+        app = App(device_manager=_ListOnlyDeviceService())
+        self.assertIsNone(app._first_device())
+
+
+class _RecordingSession:
+    """Minimal session collecting the replies sent by App.dispatch"""
+
+    id = "1"
+
+    def __init__(self):
+        self.replies = []
+
+    async def send_okay(self, data=None, *, raw=False):
+        self.replies.append(("OKAY", data))
+
+    async def send_fail(self, reason, *, raw=False):
+        self.replies.append(("FAIL", reason))
+
+
+class _UnprefixedService:
+    @route("version")
+    async def version(self):
+        return routing.OK(b"0029")
+
+
+class TestAppHostFallback(unittest.TestCase):
+    """Test matching 'host:' requests against routes registered without the prefix"""
+
+    def _dispatch(self, app, payload):
+        session = _RecordingSession()
+        asyncio.run(app.dispatch(payload, session))
+        return session.replies
+
+    def test_warns_once_per_app(self):
+        """Test that the fallback warns on first use only, separately for each App"""
+        apps = []
+        for _ in range(2):
+            app = App(device_manager=SingleDeviceService())
+            app.register(_UnprefixedService())
+            apps.append(app)
+
+        with self.assertWarns(UserWarning):
+            self.assertEqual(self._dispatch(apps[0], "host:version"), [("OKAY", b"0029")])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.assertEqual(self._dispatch(apps[0], "host:version"), [("OKAY", b"0029")])
+        with self.assertWarns(UserWarning):
+            self._dispatch(apps[1], "host:version")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Session tests
+
+Tests for smart-socket connection handling that do not need an adb client
+"""
+
+import asyncio
+import sys
+import os
+import unittest
+from typing import Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyadbserver.server import App, AdbServer
+from pyadbserver.services.host import HostService
+from pyadbserver.transport.device import Device
+from pyadbserver.transport.device_manager import SingleDeviceService
+
+
+class TestIdleTimeout(unittest.IsolatedAsyncioTestCase):
+    """Test closing connections that send no request"""
+
+    async def _start(self, idle_timeout: Optional[float]) -> int:
+        manager = SingleDeviceService(device=Device(id="1", serial="s1"))
+        app = App(device_manager=manager)
+        self.server = AdbServer(app=app, port=0, idle_timeout=idle_timeout)
+        app.register(HostService(self.server, manager))
+        await self.server.start()
+        return self.server.bound_port
+
+    async def asyncTearDown(self) -> None:
+        await self.server.stop()
+
+    async def test_idle_connection_closed(self):
+        """Test that a client sending nothing is disconnected after the timeout"""
+        port = await self._start(idle_timeout=0.1)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # Closed silently, without a FAIL reply
+        self.assertEqual(await asyncio.wait_for(reader.read(), 2), b"")
+        writer.close()
+
+    async def test_kept_alive_connection_closed(self):
+        """Test that the timeout also applies between requests on a kept-alive connection"""
+        port = await self._start(idle_timeout=0.1)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # Switching transport keeps the connection open for the next request
+        writer.write(b"0012host:transport-any")
+        self.assertEqual(await reader.readexactly(4), b"OKAY")
+        self.assertEqual(await asyncio.wait_for(reader.read(), 2), b"")
+        writer.close()
+
+    async def test_no_timeout_by_default(self):
+        """Test that without idle_timeout the server keeps waiting for a request"""
+        port = await self._start(idle_timeout=None)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(reader.read(1), 0.3)
+        writer.write(b"000chost:version")
+        self.assertEqual((await asyncio.wait_for(reader.read(), 2))[:4], b"OKAY")
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
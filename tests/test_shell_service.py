@@ -93,6 +93,19 @@ class TestShellProtocol(unittest.TestCase):
         self.assertEqual(packet_id, ShellProtocolId.STDOUT)
         self.assertEqual(decoded_data, original_data)
 
+    def test_decode_header_in_place(self):
+        """Test decoding a header from a longer buffer at an offset"""
+        first = encode_shell_packet(ShellProtocolId.STDOUT, b"out")
+        buffer = first + encode_shell_packet(ShellProtocolId.EXIT, b"\x03")
+
+        packet_id, length = decode_shell_packet_header(buffer)
+        self.assertEqual(packet_id, ShellProtocolId.STDOUT)
+        self.assertEqual(length, 3)
+
+        packet_id, length = decode_shell_packet_header(buffer, len(first))
+        self.assertEqual(packet_id, ShellProtocolId.EXIT)
+        self.assertEqual(length, 1)
+
     def test_large_packet(self):
         """Test large packet (4KB)"""
         large_data = b"x" * 4096
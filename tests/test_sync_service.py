@@ -1,13 +1,18 @@
 import asyncio
+import gzip
 import os
+import struct
 import sys
 import tempfile
+import unittest
 from typing import List, Any
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from pyadbserver.services import SyncV1Service, MemoryFileSystem
+from pyadbserver.server import App, AdbServer
+from pyadbserver.services import SyncV1Service, MemoryFileSystem, LocalFileSystem
 from tests.base_test import AdbServerTestCase
+from pyadbserver.transport.device import Device
 from pyadbserver.transport.device_manager import SingleDeviceService
 
 
@@ -77,3 +82,65 @@ class TestSyncService(AdbServerTestCase):
             self.assertEqual(mem_content, content, f"Content mismatch for {filename}")
 
 
+class _GzipFileSystem(LocalFileSystem):
+    """File system returning file objects that wrap a descriptor, like custom backends may"""
+
+    def open_for_read(self, path):
+        return gzip.open(self._resolve(path), "rb")
+
+
+class TestSyncRecv(unittest.IsolatedAsyncioTestCase):
+    """Test RECV over a raw sync connection (no adb needed)"""
+
+    CONTENT = bytes(range(256)) * 5000  # more than one read block
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self._tmpdir.name, "file.bin"), "wb") as f:
+            f.write(self.CONTENT)
+        with gzip.open(os.path.join(self._tmpdir.name, "file.bin.gz"), "wb") as f:
+            f.write(self.CONTENT)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    async def _recv(self, fs, path: bytes):
+        """Start a server, RECV `path` over a sync connection and return the raw packets."""
+        device_manager = SingleDeviceService(device=Device(id="d", serial="s-1"))
+        app = App(device_manager=device_manager)
+        server = AdbServer(app=app, port=0)
+        app.register(SyncV1Service(fs))
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.bound_port)
+            writer.write(b"0005sync:")
+            self.assertEqual(await reader.readexactly(4), b"OKAY")
+            writer.write(b"RECV" + struct.pack("<I", len(path)) + path)
+            packets = []
+            while True:
+                cmd, length = struct.unpack("<4sI", await reader.readexactly(8))
+                if cmd in (b"DATA", b"FAIL"):
+                    packets.append((cmd, await reader.readexactly(length)))
+                else:
+                    packets.append((cmd, length))
+                if cmd != b"DATA":
+                    break
+            writer.write(b"QUIT\0\0\0\0")
+            await reader.read()
+            writer.close()
+            return packets
+        finally:
+            await server.stop()
+
+    def _assert_content(self, packets):
+        self.assertEqual(packets[-1], (b"DONE", 0))
+        self.assertTrue(all(cmd == b"DATA" and len(data) <= 64 * 1024 for cmd, data in packets[:-1]))
+        self.assertEqual(b"".join(data for _, data in packets[:-1]), self.CONTENT)
+
+    async def test_local_file(self):
+        """Test that a local file arrives complete, in DATA packets of at most 64 KiB"""
+        self._assert_content(await self._recv(LocalFileSystem(self._tmpdir.name), b"/file.bin"))
+
+    async def test_wrapped_file(self):
+        """Test that what read() returns is sent, not the bytes of the underlying descriptor"""
+        self._assert_content(await self._recv(_GzipFileSystem(self._tmpdir.name), b"/file.bin.gz"))